@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 
 import argparse
-from collections import Counter
+from collections import Counter, deque
 import calendar
 import time
 import os
@@ -12,11 +12,25 @@ from typing import Dict, List
 import tempfile
 import shutil
 import difflib
+import hashlib
+import hmac
+import io
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
 
 from jinja2 import Environment, FileSystemLoader
 from weasyprint import HTML, CSS
 import matplotlib.pyplot as plt
 
+SNAPSHOT_VERSION = 1
+SNAPSHOT_KEYS = ['timestamp', 'format', 'total_user', 'cracked', 'formats', 'length', 'history_reuse']
+CHUNK_SIZE = 64 * 1024 * 1024
+# Merging chunk results stays serial in the main process, so the pool only beats a plain read with enough workers
+POOL_MIN_WORKERS = 4
+POOL_MIN_SIZE = 4 * CHUNK_SIZE
+
 TEMPLATE = '''<html>
     <head>
         <title>{{page_title_text}}</title>
@@ -153,6 +167,208 @@ TEMPLATE = '''<html>
 </html>
 '''
 
+COMPARE_TEMPLATE = '''<html>
+    <head>
+        <title>{{page_title_text}}</title>
+    </head>
+    <body>
+            <h1 style="align: center;">{{title_text}}</h1>
+            <br>
+            <table>
+                <thead>
+                    <tr>
+                        <th scope="col"></th>
+                        <th scope="col">Previous audit</th>
+                        <th scope="col">Current audit</th>
+                        <th scope="col">Delta</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    <tr>
+                        <td>Date</td>
+                        <td>{{old.date}}</td>
+                        <td>{{new.date}}</td>
+                        <td></td>
+                    </tr>
+                    <tr>
+                        <td>Total hashes submitted</td>
+                        <td>{{old.total_user}}</td>
+                        <td>{{new.total_user}}</td>
+                        <td>{{ '%+d'| format(new.total_user - old.total_user) }}</td>
+                    </tr>
+                    <tr>
+                        <td>Passwords found</td>
+                        <td>{{old.cracked}}</td>
+                        <td>{{new.cracked}}</td>
+                        <td>{{ '%+d'| format(new.cracked - old.cracked) }}</td>
+                    </tr>
+                    <tr>
+                        <td>Percent of recovered passwords</td>
+                        <td>{{old.cracked_pct}}%</td>
+                        <td>{{new.cracked_pct}}%</td>
+                        <td>{{ '%+.2f'| format(new.cracked_pct - old.cracked_pct) }}%</td>
+                    </tr>
+                    <tr>
+                        <td>Users with similar password pattern along history</td>
+                        <td>{{old.history_reuse}}</td>
+                        <td>{{new.history_reuse}}</td>
+                        <td>{{ '%+d'| format(new.history_reuse - old.history_reuse) }}</td>
+                    </tr>
+                </tbody>
+            </table>
+            <br>
+            {% if accounts %}
+            <h3 id="accounts">Accounts evolution</h3>
+            <table>
+                <thead>
+                    <tr>
+                        <th scope="col">Accounts</th>
+                        <th scope="col">Count</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for label,count in accounts.items() %}
+                    <tr>
+                        <td>{{label}}</td>
+                        <td>{{count}}</td>
+                    </tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+            <br>
+            {% endif %}
+            <h3 id="format">Password Format repartition</h3>
+            <table>
+                <thead>
+                    <tr>
+                        <th scope="col">Format</th>
+                        <th scope="col">Previous</th>
+                        <th scope="col">Current</th>
+                        <th scope="col">Delta</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for format,(old_count,new_count) in format.items() %}
+                    <tr>
+                        <td>{{format}}</td>
+                        <td>{{old_count}}</td>
+                        <td>{{new_count}}</td>
+                        <td>{{ '%+d'| format(new_count - old_count) }}</td>
+                    </tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+            <br>
+            <h3 id="length">Password Length repartition</h3>
+            <table>
+                <thead>
+                    <tr>
+                        <th scope="col">Length</th>
+                        <th scope="col">Previous</th>
+                        <th scope="col">Current</th>
+                        <th scope="col">Delta</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for length,(old_count,new_count) in length.items() %}
+                    <tr>
+                        <td>{{length}}</td>
+                        <td>{{old_count}}</td>
+                        <td>{{new_count}}</td>
+                        <td>{{ '%+d'| format(new_count - old_count) }}</td>
+                    </tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+            <br>
+            <div class="crop-container">
+                <img src='{{img_length}}' style="width: 800px">
+            </div>
+            <br>
+            <span id=footer>Report generated with <a href="https://github.com/Orange-Cyberdefense/graphcat">https://github.com/Orange-Cyberdefense/graphcat</a>, a tool by Orange Cyberdefense.</span>
+    </body>
+</html>
+'''
+
+REPORT_CSS = '''
+    @page {size: A4; margin: 1cm; @bottom-right {
+        font-size: 10px;
+        content: counter(page) " / " counter(pages);
+        margin: 10px 10px 25px 10px;
+    }} 
+    th, td {border: 1px solid black;}
+    img {width: 100%}
+    .crop-container {overflow: hidden;}
+    .crop-container img {margin-left: -50px;}
+    h1 {text-align: center;font-size:30px;}
+    h3 {font-size:24px;}
+    table {width: 85%; border-collapse: collapse; margin-right: auto;}
+    table,th,td {border: 1px solid black;}
+    thead {background-color: #3563EC;color: #ffffff; font-size: 18px;}
+    th {text-align: center;height: 50px;}
+    td {font-size: 16px; text-align: left;padding: 5px; vertical-align: center;}
+    @media print {h3 {page-break-before: always;}}
+    @font-face {
+    font-family: 'Titillium Web';
+    font-style: normal;
+    font-weight: 300;
+    src: local('Titillium Web Light'), local('TitilliumWeb-Light');
+    }
+    *, div {font-family: 'Titillium Web';}
+    #footer {font-size:8px;}
+'''
+
+def available_cpus():
+    # CPUs this process may run on, which can be fewer than the host's in a container or under taskset
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def split_file(path, chunk_size):
+    size = os.path.getsize(path)
+    chunks = list()
+    start = 0
+    with open(path, 'rb') as f:
+        while start < size:
+            f.seek(start + chunk_size)
+            f.readline()
+            end = min(f.tell(), size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+def open_chunk(path, start, end):
+    # Decoded once per chunk with the same encoding and newline handling as open(path, 'r')
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return io.TextIOWrapper(io.BytesIO(f.read(end - start)))
+
+def parse_potfile_lines(lines, john):
+    arr = dict()
+    for line in lines:
+        l = line.rstrip('\n')
+        if ':' in l:
+            l = l.split(':',1)
+            if john:
+                if '$NT$' in l[0]:
+                    l[0] = l[0].replace('$NT$','')
+                else:
+                    continue
+            arr[l[0].lower()]=l[1]
+    return arr
+
+def parse_hashfile_lines(lines, format):
+    if format in ['1','2']:
+        return [line.rstrip('\n') for line in lines ]
+    return [line.rstrip('\n').split(':::')[0] for line in lines
+            if '$:' not in line and '$_history' not in line and ':::' in line]
+
+def parse_potfile_chunk(path, start, end, john):
+    return parse_potfile_lines(open_chunk(path, start, end), john)
+
+def parse_hashfile_chunk(path, start, end, format):
+    return parse_hashfile_lines(open_chunk(path, start, end), format)
+
 class Secret:
     def __init__(self, nthash: str, cleartext: str = None):
         self.nthash = nthash
@@ -196,38 +412,17 @@ class GraphCat:
             if not os.path.isdir(self.outputdir):
                 os.makedirs(self.outputdir, exist_ok=True)
 
-        print('[-] Parsing potfile')
-        if options.potfile is not None:
-            arr = dict()
-            with open(options.potfile, 'r') as lines:
-                for line in lines:
-                    l = line.rstrip('\n')
-                    if ':' in l:
-                        l = l.split(':',1)
-                        if options.john:
-                            if '$NT$' in l[0]:
-                                l[0] = l[0].replace('$NT$','')
-                            else:
-                                continue
-                        arr[l[0].lower()]=l[1]
-                self.potfile = arr
+        if options.format not in ['1','2','3']:
+            print('[!] Unknown format')
+            sys.exit(1)
+
+        print('[-] Parsing potfile and hashfile')
+        self.potfile, self.hashes = self.parse_inputs()
         if len(self.potfile) == 0:
             print('[!] No entry in potfile. Exiting...')
             sys.exit(1)
         print('[-] %s entries in potfile' % len(self.potfile))
 
-        print('[-] Parsing hashfile')
-        if options.hashfile is not None:
-            
-            with open(options.hashfile, 'r') as lines:
-                if options.format in ['1','2']:
-                    self.hashes = [line.rstrip('\n') for line in lines ]
-                elif options.format == '3':
-                    self.hashes = [line.rstrip('\n').split(':::')[0] for line in lines 
-                    if '$:' not in line and '$_history' not in line and ':::' in line]
-                else:
-                    print('[!] Unknown format')
-                    sys.exit(1)
         if len(self.hashes) == 0:
             print('[!] No entry in hashfile. Exiting...')
             sys.exit(1)
@@ -238,6 +433,46 @@ class GraphCat:
         self._user_and_nt_dict = None
         self._all_nt_hash = None
 
+    def parse_inputs(self):
+        workers = min(self.options.workers, available_cpus())
+        input_size = os.path.getsize(self.options.potfile) + os.path.getsize(self.options.hashfile)
+        # Spawned workers would re-import matplotlib and weasyprint, which costs more than the pool saves
+        fork = 'fork' in multiprocessing.get_all_start_methods()
+        if not fork or workers < POOL_MIN_WORKERS or input_size < POOL_MIN_SIZE:
+            with open(self.options.potfile, 'r') as lines:
+                potfile = parse_potfile_lines(lines, self.options.john)
+            with open(self.options.hashfile, 'r') as lines:
+                hashes = parse_hashfile_lines(lines, self.options.format)
+            return potfile, hashes
+
+        # Chunks of both files are interleaved so they are read at the same time. Results are merged
+        # in file order as soon as they are ready, so later potfile entries still override earlier ones,
+        # and only a bounded number of chunk results is alive at once.
+        tasks = list()
+        for pot_chunk, hash_chunk in zip_longest(split_file(self.options.potfile, CHUNK_SIZE), split_file(self.options.hashfile, CHUNK_SIZE)):
+            if pot_chunk is not None:
+                tasks.append((parse_potfile_chunk, self.options.potfile, *pot_chunk, self.options.john))
+            if hash_chunk is not None:
+                tasks.append((parse_hashfile_chunk, self.options.hashfile, *hash_chunk, self.options.format))
+
+        potfile = dict()
+        hashes = list()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            pending = deque()
+            for task in tasks:
+                pending.append((task[0], executor.submit(*task)))
+                if len(pending) > 2 * workers:
+                    self.merge_chunk(potfile, hashes, *pending.popleft())
+            while pending:
+                self.merge_chunk(potfile, hashes, *pending.popleft())
+        return potfile, hashes
+
+    def merge_chunk(self, potfile, hashes, parser, future) -> None:
+        if parser is parse_potfile_chunk:
+            potfile.update(future.result())
+        else:
+            hashes.extend(future.result())
+
     def gen_stat(self) -> Dict:
         print('[-] Generating graphs...')
 
@@ -249,6 +484,14 @@ class GraphCat:
 
         found = dict()
 
+        format = self.format_stats()
+        longueur = self.length_stats()
+        history_reuse = self.analyze_history()
+
+        # Saved before the exit below, an audit without cracked password is still a valid baseline
+        if self.options.snapshot is not None:
+            self.save_snapshot(total_user, format, longueur, history_reuse)
+
         if len(self.cracked_users) < 1 :
             print('[!] Not user cracked ! Exiting...')
             sys.exit(0)
@@ -285,16 +528,6 @@ class GraphCat:
 
         # Pie N°2 : Format
 
-        format = dict()
-
-        format['Empty'] = len([e[0] for e in self.cracked_users.items() if e[1] == ''])
-        format['Numeric'] = len([e[0] for e in self.cracked_users.items() if re.match('^[0-9]+$',e[1])])
-        format['Alpha'] = len([e[0] for e in self.cracked_users.items() if re.match('^[a-zA-Z]+$',e[1])])
-        format['Alpha + Numeric'] = len([e[0] for e in self.cracked_users.items() if re.match('^(?=[a-zA-Z0-9]*[0-9])(?=[a-zA-Z0-9]*[a-z])(?=[a-zA-Z0-9]*[A-Z])[a-zA-Z0-9]+$',e[1])])
-        format['Alpha + Special'] = len([e[0] for e in self.cracked_users.items() if re.match('^(?=[a-zA-Z!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[a-z])(?=[a-zA-Z!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[A-Z])(?=[a-zA-Z!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?])[a-zA-Z!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]+$',e[1])])
-        format['Numeric + Special'] = len([e[0] for e in self.cracked_users.items() if re.match('^(?=[0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[0-9])(?=[0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?])[0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]+$',e[1])])
-        format['Alpha + Numeric + Special'] = len([e[0] for e in self.cracked_users.items() if re.match('^(?=[a-zA-Z0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[0-9])(?=[a-zA-Z0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[a-z])(?=[a-zA-Z0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[A-Z])(?=[a-zA-Z0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?])[a-zA-Z0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]+$',e[1])])
-
         else_format = 0 # Merging every format with less than 1% into 'Other' category 
         for val in format.values(): 
             if val < (found['Recovered']/100):
@@ -327,20 +560,6 @@ class GraphCat:
 
         # Pie N°3 : Length repartition
 
-        longueur = dict()
-
-        longueur['0-5'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{0,5}$',e[1])])
-        longueur['6'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{6}$',e[1])])
-        longueur['7'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{7}$',e[1])])
-        longueur['8'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{8}$',e[1])])
-        longueur['9'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{9}$',e[1])])
-        longueur['10'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{10}$',e[1])])
-        longueur['11'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{11}$',e[1])])
-        longueur['12'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{12}$',e[1])])
-        longueur['13'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{13}$',e[1])])
-        longueur['14'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{14}$',e[1])])
-        longueur['15+'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{15,}$',e[1])])
-
         longueur_max = max(longueur.values())
 
         plt.clf()
@@ -424,7 +643,6 @@ class GraphCat:
 
         # Chart N°7 Password same as in password history
 
-        history_reuse = self.analyze_history()
         if history_reuse > 0:
             plt.clf()
             plt.figure(figsize=[15, 7])
@@ -483,33 +701,7 @@ class GraphCat:
         with open(os.path.join(dirpath,'report.html'), 'w') as f:
             f.write(html)  
 
-        css = CSS(string='''
-            @page {size: A4; margin: 1cm; @bottom-right {
-                font-size: 10px;
-                content: counter(page) " / " counter(pages);
-                margin: 10px 10px 25px 10px;
-            }} 
-            th, td {border: 1px solid black;}
-            img {width: 100%}
-            .crop-container {overflow: hidden;}
-            .crop-container img {margin-left: -50px;}
-            h1 {text-align: center;font-size:30px;}
-            h3 {font-size:24px;}
-            table {width: 85%; border-collapse: collapse; margin-right: auto;}
-            table,th,td {border: 1px solid black;}
-            thead {background-color: #3563EC;color: #ffffff; font-size: 18px;}
-            th {text-align: center;height: 50px;}
-            td {font-size: 16px; text-align: left;padding: 5px; vertical-align: center;}
-            @media print {h3 {page-break-before: always;}}
-            @font-face {
-            font-family: 'Titillium Web';
-            font-style: normal;
-            font-weight: 300;
-            src: local('Titillium Web Light'), local('TitilliumWeb-Light');
-            }
-            *, div {font-family: 'Titillium Web';}
-            #footer {font-size:8px;}
-            ''')
+        css = CSS(string=REPORT_CSS)
 
         filename = "graphcat_%s.pdf" % self.timestamp
 
@@ -520,6 +712,58 @@ class GraphCat:
         shutil.rmtree(dirpath)
         print('[-] Report available at %s' % filename)
 
+    def format_stats(self) -> Dict:
+        format = dict()
+
+        format['Empty'] = len([e[0] for e in self.cracked_users.items() if e[1] == ''])
+        format['Numeric'] = len([e[0] for e in self.cracked_users.items() if re.match('^[0-9]+$',e[1])])
+        format['Alpha'] = len([e[0] for e in self.cracked_users.items() if re.match('^[a-zA-Z]+$',e[1])])
+        format['Alpha + Numeric'] = len([e[0] for e in self.cracked_users.items() if re.match('^(?=[a-zA-Z0-9]*[0-9])(?=[a-zA-Z0-9]*[a-z])(?=[a-zA-Z0-9]*[A-Z])[a-zA-Z0-9]+$',e[1])])
+        format['Alpha + Special'] = len([e[0] for e in self.cracked_users.items() if re.match('^(?=[a-zA-Z!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[a-z])(?=[a-zA-Z!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[A-Z])(?=[a-zA-Z!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?])[a-zA-Z!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]+$',e[1])])
+        format['Numeric + Special'] = len([e[0] for e in self.cracked_users.items() if re.match('^(?=[0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[0-9])(?=[0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?])[0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]+$',e[1])])
+        format['Alpha + Numeric + Special'] = len([e[0] for e in self.cracked_users.items() if re.match('^(?=[a-zA-Z0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[0-9])(?=[a-zA-Z0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[a-z])(?=[a-zA-Z0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[A-Z])(?=[a-zA-Z0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]*[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?])[a-zA-Z0-9!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]+$',e[1])])
+        return format
+
+    def length_stats(self) -> Dict:
+        longueur = dict()
+
+        longueur['0-5'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{0,5}$',e[1])])
+        longueur['6'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{6}$',e[1])])
+        longueur['7'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{7}$',e[1])])
+        longueur['8'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{8}$',e[1])])
+        longueur['9'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{9}$',e[1])])
+        longueur['10'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{10}$',e[1])])
+        longueur['11'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{11}$',e[1])])
+        longueur['12'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{12}$',e[1])])
+        longueur['13'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{13}$',e[1])])
+        longueur['14'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{14}$',e[1])])
+        longueur['15+'] = len([e[0] for e in self.cracked_users.items() if re.match('^.{15,}$',e[1])])
+        return longueur
+
+    def save_snapshot(self, total_user, format, length, history_reuse) -> None:
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'timestamp': self.timestamp,
+            'format': self.options.format,
+            'total_user': total_user,
+            'cracked': len(self.cracked_users),
+            'formats': format,
+            'length': length,
+            'history_reuse': history_reuse,
+        }
+        if self.options.snapshot_accounts:
+            # Lets compare mode detect snapshots hashed with different keys
+            snapshot['key_check'] = self.hash_username('graphcat-snapshot-key-check')
+            snapshot['accounts'] = {self.hash_username(user.username):int(user.cracked) for user in self.users.values()}
+
+        with open(self.options.snapshot, 'w') as f:
+            json.dump(snapshot, f, separators=(',',':'))
+        print('[-] Snapshot available at %s' % self.options.snapshot)
+
+    def hash_username(self, username: str) -> str:
+        # Keyed hash: stable across audits using the same key, not reversible from a user list without it
+        return hmac.new(self.options.snapshot_key.encode(), username.lower().encode(), hashlib.sha256).hexdigest()[:16]
+
     def isNaN(self,num):
         return num!= num
 
@@ -626,6 +870,134 @@ class GraphCat:
         self._all_nt_hash = [user.secret.nthash for user in self.users.values()]
         return self._all_nt_hash
 
+class GraphCatCompare:
+    def __init__(self, options):
+        self.options = options
+
+        self.timestamp = calendar.timegm(time.gmtime())
+        self.outputdir = '.'
+        if options.output_dir is not None:
+            self.outputdir = options.output_dir
+            if not os.path.isdir(self.outputdir):
+                os.makedirs(self.outputdir, exist_ok=True)
+
+        print('[-] Loading snapshots')
+        self.old = self.load_snapshot(options.compare[0])
+        self.new = self.load_snapshot(options.compare[1])
+
+    def load_snapshot(self, path) -> Dict:
+        with open(path, 'r') as f:
+            try:
+                snapshot = json.load(f)
+            except ValueError:
+                snapshot = None
+        if not isinstance(snapshot, dict):
+            print('[!] Invalid snapshot %s. Exiting...' % path)
+            sys.exit(1)
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            print('[!] Unsupported snapshot version in %s. Exiting...' % path)
+            sys.exit(1)
+        if any(key not in snapshot for key in SNAPSHOT_KEYS):
+            print('[!] Invalid snapshot %s. Exiting...' % path)
+            sys.exit(1)
+
+        snapshot['date'] = time.strftime('%Y-%m-%d', time.gmtime(snapshot['timestamp']))
+        snapshot['cracked_pct'] = round((snapshot['cracked'] / snapshot['total_user']) * 100, 2) if snapshot['total_user'] > 0 else 0.0
+        return snapshot
+
+    def compare_accounts(self) -> Dict:
+        if 'accounts' not in self.old or 'accounts' not in self.new:
+            print('[!] Accounts not saved in both snapshots, skipping per-account comparison')
+            return dict()
+        if self.old['format'] == '1' or self.new['format'] == '1':
+            print('[!] Accounts have no stable username with format 1, skipping per-account comparison')
+            return dict()
+        if self.old['format'] != self.new['format']:
+            print('[!] Snapshots made from different hashfile formats, skipping per-account comparison')
+            return dict()
+        if self.old.get('key_check') != self.new.get('key_check'):
+            print('[!] Snapshots made with different -snapshot-key, skipping per-account comparison')
+            return dict()
+
+        old_accounts = self.old['accounts']
+        new_accounts = self.new['accounts']
+        common = old_accounts.keys() & new_accounts.keys()
+
+        accounts = dict()
+        accounts['Still cracked'] = len([a for a in common if old_accounts[a] and new_accounts[a]])
+        accounts['Newly cracked'] = len([a for a in common if not old_accounts[a] and new_accounts[a]])
+        accounts['No longer cracked'] = len([a for a in common if old_accounts[a] and not new_accounts[a]])
+        accounts['Never cracked'] = len([a for a in common if not old_accounts[a] and not new_accounts[a]])
+        accounts['New accounts (cracked)'] = len([a for a in new_accounts.keys() - old_accounts.keys() if new_accounts[a]])
+        accounts['New accounts (not cracked)'] = len([a for a in new_accounts.keys() - old_accounts.keys() if not new_accounts[a]])
+        accounts['Removed accounts'] = len(old_accounts.keys() - new_accounts.keys())
+        return accounts
+
+    def merge_counts(self, key) -> Dict:
+        merged = {label:(count, 0) for label, count in self.old[key].items()}
+        for label, count in self.new[key].items():
+            merged[label] = (merged.get(label, (0, 0))[0], count)
+        return merged
+
+    def gen_compare(self) -> None:
+        print('[-] Generating comparison...')
+
+        dirpath = tempfile.mkdtemp()
+
+        accounts = self.compare_accounts()
+        format = self.merge_counts('formats')
+        longueur = self.merge_counts('length')
+
+        # Chart N°1 : Length repartition, previous against current
+
+        plt.clf()
+        x = list(range(len(longueur)))
+        plt.figure(figsize=[15, 7])
+        plt.bar([i - 0.2 for i in x], [v[0] for v in longueur.values()], width=0.4, color='#A0A0A0', edgecolor='white', label=self.old['date'])
+        plt.bar([i + 0.2 for i in x], [v[1] for v in longueur.values()], width=0.4, color='#3563EC', edgecolor='white', label=self.new['date'])
+        plt.xticks(x, longueur.keys(), fontsize=15)
+        plt.yticks(fontsize=15)
+        plt.xlabel('Length', fontsize=20)
+        plt.ylabel("Count", fontsize=20)
+        plt.legend(fontsize=16)
+        plt.savefig(os.path.join(dirpath,'length.png'), dpi=118)
+        if self.options.export_charts:
+            print('[-] Password length comparison available at length_compare.png')
+            plt.savefig(os.path.join(self.outputdir,'length_compare.png'), dpi=118)
+
+        print('[-] Generating report...')
+
+        with open(os.path.join(dirpath, 'template.html'), 'w') as template:
+            template.write(COMPARE_TEMPLATE)
+
+        env = Environment(loader=FileSystemLoader(dirpath))
+
+        template = env.get_template('template.html')
+
+        html = template.render(page_title_text='Password Cracking Comparison Report',
+                            title_text='Password Cracking Comparison Report',
+                            old = self.old,
+                            new = self.new,
+                            accounts = accounts,
+                            format = format,
+                            length = longueur,
+                            img_length = os.path.join(dirpath,'length.png'),
+                            )
+
+        with open(os.path.join(dirpath,'report.html'), 'w') as f:
+            f.write(html)
+
+        css = CSS(string=REPORT_CSS)
+
+        filename = "graphcat_compare_%s.pdf" % self.timestamp
+
+        HTML(os.path.join(dirpath,'report.html')).write_pdf(os.path.join(self.outputdir,filename), stylesheets=[css], optimize_size=('fonts', 'images'))
+
+        # Cleanup
+
+        shutil.rmtree(dirpath)
+        print('[-] Report available at %s' % filename)
+
 if __name__ == '__main__':
     
     parser = argparse.ArgumentParser(
@@ -635,7 +1007,6 @@ if __name__ == '__main__':
     parser.add_argument(
         "-potfile",
         action="store",
-        required=True,
         metavar="hashcat.potfile",
         help="Hashcat Potfile",
     )
@@ -643,22 +1014,50 @@ if __name__ == '__main__':
     parser.add_argument(
         "-hashfile",
         action="store",
-        required=True,
         metavar="hashfile.txt",
         help="File containing hashes (one per line)",
     )
 
     parser.add_argument("-john", action="store_true", help="John potfile")
-    parser.add_argument("-format", action="store", default="3", help="hashfile format (default 3): 1 for hash; 2 for username:hash; 3 for secretsdump (username:uid:lm:ntlm)")
+    parser.add_argument("-format", action="store", help="hashfile format (default 3): 1 for hash; 2 for username:hash; 3 for secretsdump (username:uid:lm:ntlm)")
+    parser.add_argument("-workers", action="store", type=int, default=available_cpus(), help="Number of processes used to parse large potfile and hashfile (default: number of CPUs, parallel parsing needs at least 4)")
     parser.add_argument("-export-charts", action="store_true", help="Output also charts in png")
     parser.add_argument("-output-dir", action="store", help="Output directory")
+    parser.add_argument("-snapshot", action="store", metavar="snapshot.json", help="Save computed statistics into a snapshot file")
+    parser.add_argument("-snapshot-accounts", action="store_true", help="Include per-account cracked flags (keyed by HMAC of username) in the snapshot")
+    parser.add_argument("-snapshot-key", action="store", help="Secret key used to hash usernames with -snapshot-accounts (reuse the same key across audits)")
+    parser.add_argument("-compare", action="store", nargs=2, metavar=("old.json", "new.json"), help="Generate a comparison report from two snapshots")
     parser.add_argument("-debug", action="store_true", help="Turn DEBUG output ON")
 
     options = parser.parse_args()
 
+    if options.compare is not None:
+        if options.potfile is not None or options.hashfile is not None or options.john or options.format is not None \
+                or options.snapshot is not None or options.snapshot_accounts or options.snapshot_key is not None:
+            parser.error("-compare cannot be combined with -potfile, -hashfile, -john, -format or -snapshot options")
+    elif options.potfile is None or options.hashfile is None:
+        parser.error("-potfile and -hashfile are required unless -compare is used")
+    if options.workers < 1:
+        parser.error("-workers must be at least 1")
+    if options.format is None:
+        options.format = "3"
+    if options.snapshot_accounts:
+        if options.snapshot is None:
+            parser.error("-snapshot-accounts requires -snapshot")
+        if options.snapshot_key is None:
+            parser.error("-snapshot-accounts requires -snapshot-key")
+        if options.format == "1":
+            parser.error("-snapshot-accounts requires usernames, it cannot be used with -format 1")
+    if options.snapshot_key is not None and not options.snapshot_accounts:
+        parser.error("-snapshot-key requires -snapshot-accounts")
+
     try:
-        executor = GraphCat(options)
-        executor.gen_stat()
+        if options.compare is not None:
+            executor = GraphCatCompare(options)
+            executor.gen_compare()
+        else:
+            executor = GraphCat(options)
+            executor.gen_stat()
     except Exception as e:
         if options.debug:
             import traceback